@@ -1,4 +1,4 @@
-import textwrap
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
@@ -6,6 +6,62 @@ import streamlit as st
 # =========================================================
 # Core compound interest logic
 # =========================================================
+def _growth_factors(rates, use_yearly_compounding):
+    """
+    Per-year growth factor g and contribution factor ann, so that one year of
+    compounding is balance*g + monthly_contrib*ann.
+    """
+    if use_yearly_compounding:
+        # --- YEARLY COMPOUNDING LOGIC ---
+        # Growth based on start balance, then a full year of contributions
+        g = 1.0 + rates
+        ann = np.full(np.shape(rates), 12.0)
+    else:
+        # --- MONTHLY COMPOUNDING LOGIC ---
+        # Twelve "deposit, then grow by r/12" steps in closed form:
+        # balance*g + contrib*ann, with g = (1 + r/12)**12 and the annuity-due
+        # factor ann = (g - 1)/(r/12)*(1 + r/12) (or 12 when r == 0).
+        i = rates / 12.0
+        g = (1.0 + i) ** 12
+        safe_i = np.where(i == 0.0, 1.0, i)
+        ann = np.where(i == 0.0, 12.0, (g - 1.0) / safe_i * (1.0 + i))
+    return g, ann
+
+
+def _compound_kernel(start_balance, contribs, expenses, rates, use_yearly_compounding):
+    """
+    Year-by-year balance recurrence on float64 arrays.
+    Returns (StartBalance, EndBalance, ContribYear, InvestGrowthYear) arrays.
+    rates may carry a leading scenario axis (years run along the last axis).
+    """
+    g, ann = _growth_factors(rates, use_yearly_compounding)
+
+    # Annual Expense is deducted at Year End, so each year is the linear step
+    # end = start*g + (contrib*ann - expense). Dividing by the running growth
+    # product P turns it into a plain cumulative sum:
+    #   end[t] = P[t] * (start_balance + sum_{k<=t} step[k] / P[k])
+    # (g > 0 for any return above -100%, so P never vanishes)
+    contrib_year = contribs * 12.0
+    step = contribs * ann - expenses
+    growth_prod = np.cumprod(g, axis=-1)
+    end_bal = growth_prod * (start_balance + np.cumsum(step / growth_prod, axis=-1))
+
+    # --- START OF YEAR SNAPSHOT ---
+    # The balance available on Day 1 of each year is the prior year's end
+    start_bal = np.empty(end_bal.shape)
+    start_bal[..., :1] = start_balance
+    start_bal[..., 1:] = end_bal[..., :-1]
+
+    growth_year = start_bal * (g - 1.0) + contribs * (ann - 12.0)
+
+    return start_bal, end_bal, contrib_year, growth_year
+
+
+# Cached: Streamlit reruns the whole script on every widget change, but the
+# schedule only depends on these inputs (results are returned as copies).
+# Two schedules are built per rerun, so a small bound keeps recent slider
+# positions warm without letting the cache grow for the whole session.
+@st.cache_data(show_spinner=False, max_entries=32)
 def compound_schedule(
     start_balance,
     years,
@@ -18,91 +74,50 @@ def compound_schedule(
     if annual_rate_by_year is not None and len(annual_rate_by_year) != years:
         raise ValueError("annual_rate_by_year length must equal 'years'")
 
-    balance = start_balance
-    cum_contrib = 0.0
-    cum_expense_abs = 0.0
-
-    rows = []
-
-    for year_idx in range(years):
-        if annual_rate_by_year is not None:
-            r = annual_rate_by_year[year_idx]
-        else:
-            r = annual_rate if annual_rate is not None else 0.0
+    contribs = np.asarray(monthly_contrib_by_year, dtype=np.float64)[:years]
+    expenses = np.asarray(annual_expense_by_year, dtype=np.float64)[:years]
+    if annual_rate_by_year is not None:
+        rates = np.asarray(annual_rate_by_year, dtype=np.float64)
+    else:
+        rates = np.full(years, annual_rate if annual_rate is not None else 0.0)
 
-        # --- START OF YEAR SNAPSHOT ---
-        # This is the balance available on Day 1 of the year
-        balance_start_year = balance
-        
-        contrib_year = 0.0
-        growth_year_sum = 0.0
-
-        if use_yearly_compounding:
-            # --- YEARLY COMPOUNDING LOGIC ---
-            # Growth based on start balance
-            growth_year_sum = balance * r
-            balance += growth_year_sum
-            
-            monthly_val = monthly_contrib_by_year[year_idx]
-            annual_contrib = monthly_val * 12.0
-            balance += annual_contrib
-            
-            contrib_year = annual_contrib
-            cum_contrib += annual_contrib
-        else:
-            # --- MONTHLY COMPOUNDING LOGIC ---
-            # We assume contributions happen during the year, but we still track
-            # start balance as the anchor.
-            m = 12
-            for _ in range(m):
-                monthly_contrib = monthly_contrib_by_year[year_idx]
-                balance += monthly_contrib
-                cum_contrib += monthly_contrib
-                contrib_year += monthly_contrib
-
-                growth_month = balance * (r / m)
-                balance += growth_month
-                growth_year_sum += growth_month
-
-        balance_before_expense = balance
-        annual_expense = annual_expense_by_year[year_idx]
-
-        # Deduct Annual Expense at Year End (or throughout, simplified here as net deduction)
-        balance = balance_before_expense - annual_expense
-        cum_expense_abs += annual_expense
-
-        # GROWTH CALCULATION (The "Plug"):
-        net_growth_cum = balance - (start_balance + cum_contrib)
-        
-        # We record both Start and End balance.
-        # For the requested "Start of Year" view, 'StartBalance' is the key metric.
-        rows.append(
-            {
-                "Year": year_idx + 1,
-                "StartBalance": balance_start_year,
-                "EndBalance": balance,
-                "CumContributions": cum_contrib,
-                "ContribYear": contrib_year,
-                "InvestGrowth": net_growth_cum,
-                "InvestGrowthYear": growth_year_sum, 
-                "AnnualRate": r,
-                "ExpenseDrag": 0.0,      
-                "NetGrowth": net_growth_cum,
-                "AnnualExpense": annual_expense,
-                "CumulativeExpense": cum_expense_abs,
-            }
-        )
+    start_bal, end_bal, contrib_year, growth_year = _compound_kernel(
+        start_balance, contribs, expenses, rates, use_yearly_compounding
+    )
 
-    return pd.DataFrame(rows)
+    cum_contrib = np.cumsum(contrib_year)
+    # GROWTH CALCULATION (The "Plug"):
+    net_growth_cum = end_bal - (start_balance + cum_contrib)
+
+    # We record both Start and End balance.
+    # For the requested "Start of Year" view, 'StartBalance' is the key metric.
+    # Every column (Year included) is float64, so pandas keeps the frame in a
+    # single float block instead of splitting off an int block for Year.
+    return pd.DataFrame(
+        {
+            "Year": np.arange(1, years + 1, dtype=np.float64),
+            "StartBalance": start_bal,
+            "EndBalance": end_bal,
+            "CumContributions": cum_contrib,
+            "ContribYear": contrib_year,
+            "InvestGrowth": net_growth_cum,
+            "InvestGrowthYear": growth_year,
+            "AnnualRate": rates,
+            "ExpenseDrag": np.zeros(years),
+            "NetGrowth": net_growth_cum,
+            "AnnualExpense": expenses,
+            "CumulativeExpense": np.cumsum(expenses),
+        }
+    )
 
 
 # =========================================================
 # FI Simulation Helpers
 # =========================================================
 
-def simulate_period_exact(
-    start_balance_nominal,
-    start_age,
+def _bridge_final_balances(
+    start_balances,
+    start_ages,
     end_age,
     current_age,
     annual_rates_full,
@@ -113,60 +128,70 @@ def simulate_period_exact(
     early_withdrawal_tax_rate=0.0,
     use_yearly_compounding=False
 ):
-    balance = start_balance_nominal
+    """
+    Batched Barista bridge: nominal balance at end_age for each candidate
+    (start_balances[i] invested at start_ages[i]), drawing the inflated
+    expense every year. A candidate that runs dry in any year ends at 0.
+    Returns a float64 ndarray with one entry per candidate.
+    """
+    # Every candidate shares the same calendar years, so the yearly cash flows
+    # are built once and each candidate's path is read off in closed form.
+    balance = np.atleast_1d(np.asarray(start_balances, dtype=np.float64))
+    first_idx = np.broadcast_to(start_ages, balance.shape) - current_age
+    if balance.size == 0:
+        return balance
     
-    # Loop simulates years passing.
-    # If start_age=50 and end_age=60, we simulate 10 years of growth.
-    # The result 'balance' is the End-of-Year balance of the final year.
+    # Years simulated: from the earliest start age up to end_age.
+    # If a start age is 50 and end_age=60, we simulate 10 years of growth.
+    # The result is the End-of-Year balance of the final year.
     # End-of-Year 59 is effectively Start-of-Year 60.
-    for age in range(start_age, end_age):
-        year_idx = age - current_age
-        
-        if year_idx < 0 or year_idx >= len(annual_rates_full):
-            break
-            
-        r_nominal = annual_rates_full[year_idx]
-        
-        years_from_now = year_idx + 1 
-        infl_factor = (1 + infl_rate) ** years_from_now
-        
-        # 1. Income / Contributions
-        contrib_nominal = monthly_contrib_real * infl_factor
-        
-        # 2. Base Expense Calculation
-        base_expense_nominal = annual_expense_real * infl_factor
-        if tax_rate > 0:
-            base_expense_nominal = base_expense_nominal / (1.0 - tax_rate)
+    i0 = int(first_idx.min())
+    i1 = min(end_age - current_age, len(annual_rates_full))
+    if i0 < 0 or i0 >= i1:
+        return balance.copy()
+    year_idx = np.arange(i0, i1)
+    ages = current_age + year_idx
+    rates = np.asarray(annual_rates_full, dtype=np.float64)[i0:i1]
+    infl_factor = (1 + infl_rate) ** (year_idx + 1)
+    
+    # 1. Income / Contributions
+    contrib_nominal = monthly_contrib_real * infl_factor
+    
+    # 2. Base Expense Calculation
+    base_expense_nominal = annual_expense_real * infl_factor
+    if tax_rate > 0:
+        base_expense_nominal = base_expense_nominal / (1.0 - tax_rate)
 
-        # 3. Net Draw Needed
-        net_draw_nominal = base_expense_nominal
-        
-        # 4. Early Withdrawal Penalty Logic (Age < 60)
-        final_withdrawal_nominal = 0.0
-        
-        if net_draw_nominal > 0:
-            if age < 60 and early_withdrawal_tax_rate > 0:
-                final_withdrawal_nominal = net_draw_nominal / (1.0 - early_withdrawal_tax_rate)
-            else:
-                final_withdrawal_nominal = net_draw_nominal 
+    # 3. Net Draw Needed
+    net_draw_nominal = np.maximum(base_expense_nominal, 0.0)
+    
+    # 4. Early Withdrawal Penalty Logic (Age < 60)
+    final_withdrawal_nominal = net_draw_nominal
+    if early_withdrawal_tax_rate > 0:
+        final_withdrawal_nominal = np.where(
+            ages < 60, net_draw_nominal / (1.0 - early_withdrawal_tax_rate), net_draw_nominal
+        )
 
-        if use_yearly_compounding:
-            growth = balance * r_nominal
-            balance += growth
-            balance += (contrib_nominal * 12.0)
-            balance -= final_withdrawal_nominal
-        else:
-            monthly_rate = r_nominal / 12.0
-            for _ in range(12):
-                balance += contrib_nominal
-                balance += balance * monthly_rate
-            balance -= final_withdrawal_nominal
-        
-        if balance < 0:
-            balance = 0.0
-            break
-            
-    return balance
+    # Same yearly recurrence as compound_schedule: end = start*g + step, so
+    # relative to the growth product P the path is a cumulative sum. For a
+    # candidate starting in year k, its end balance in year t >= k is
+    #   P[t] * (start / P[k-1] + sum_{k<=j<=t} step[j] / P[j])
+    g, ann = _growth_factors(rates, use_yearly_compounding)
+    step = contrib_nominal * ann - final_withdrawal_nominal
+    growth_prod = np.cumprod(g)
+    cum_step = np.cumsum(step / growth_prod)
+    
+    k = first_idx - i0
+    started = k < len(year_idx)
+    k = np.minimum(k, len(year_idx))[:, None]
+    prev_prod = np.concatenate(([1.0], growth_prod))[k]
+    prev_cum = np.concatenate(([0.0], cum_step))[k]
+    paths = growth_prod * (balance[:, None] / prev_prod + cum_step - prev_cum)
+    
+    # Running out of money in any simulated year pins the balance at 0
+    broke = ((year_idx - i0 >= k) & (paths < 0)).any(axis=1)
+    final = np.where(broke, 0.0, paths[:, -1])
+    return np.where(started, final, balance)
 
 # Helper to calculate Nominal Target for a specific year
 def get_nominal_target(real_target, years_passed, infl_rate):
@@ -189,6 +214,7 @@ def get_dynamic_swr(age, base_swr):
         # e.g., 4.0% -> 3.25%
         return max(0.01, base_swr - 0.0075)
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def compute_regular_fi_age(
     df_full, current_age, start_balance_input, fi_annual_spend_today,
     infl_rate, base_swr
@@ -196,30 +222,26 @@ def compute_regular_fi_age(
     if fi_annual_spend_today <= 0 or base_swr <= 0 or df_full is None:
         return None, None
         
-    final_target_real = 0.0
+    ages = df_full["Age"].to_numpy()
     
-    # Iterate and find first crossover using Dynamic SWR
-    for row in df_full.itertuples():
-        age = row.Age
-        
-        # Determine SWR for this specific age
-        current_swr = get_dynamic_swr(age, base_swr)
-        
-        # Calculate Target for this specific age
-        target_real_at_age = fi_annual_spend_today / current_swr
-        
-        years_passed = age - current_age
-        
-        # Nominal Target for this specific year
-        target_nominal = get_nominal_target(target_real_at_age, years_passed, infl_rate)
-        
-        if row.StartBalance >= target_nominal:
-            return age, target_real_at_age
+    # Determine SWR for every age (horizon-adjusted via get_dynamic_swr)
+    current_swr = np.array([get_dynamic_swr(age, base_swr) for age in ages.tolist()], dtype=np.float64)
+    
+    # Calculate Target for each age, and its Nominal value in that year
+    target_real_at_age = fi_annual_spend_today / current_swr
+    target_nominal = get_nominal_target(target_real_at_age, ages - current_age, infl_rate)
+    
+    # First crossover (balances can dip, so this is a first-True scan)
+    hits = df_full["StartBalance"].to_numpy() >= target_nominal
+    if hits.any():
+        idx = int(hits.argmax())
+        return int(ages[idx]), float(target_real_at_age[idx])
             
     # If not found, return the target implied by the last age checked (usually 90)
     # or just the standard target. Let's return the standard 4% target for display fallback.
     return None, fi_annual_spend_today / base_swr
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def compute_barista_fi_age(
     df_full, current_age, start_balance_input, fi_annual_spend_today, barista_income_today, barista_spend_today,
     infl_rate, base_swr, barista_until_age, annual_rates_by_year_full, early_withdrawal_tax_rate, use_yearly_compounding
@@ -241,42 +263,44 @@ def compute_barista_fi_age(
     final_swr = get_dynamic_swr(barista_until_age, base_swr)
     target_real_at_finish = fi_annual_spend_today / final_swr
     
-    # Map start balances
-    balance_map = {row.Age: row.StartBalance for row in df_full.itertuples()}
-    balance_map[current_age] = start_balance_input
+    # Determine the target in Nominal terms at the finish line
+    # (the finish line is fixed, so this is the same for every candidate age)
+    years_total_horizon = barista_until_age - current_age
+    target_nominal_finish = target_real_at_finish * ((1 + infl_rate) ** years_total_horizon)
     
-    # We iterate through candidate start ages
+    # Candidate start ages with a known start balance: df_full has one row per
+    # age from current_age, and current_age itself uses the input balance.
     # Checking current_age is allowed (immediate transition)
-    for age in range(current_age, barista_until_age + 1):
-        if age not in balance_map: continue
-        
-        start_bal = balance_map[age]
-        
-        # Determine the target in Nominal terms at the finish line
-        years_total_horizon = barista_until_age - current_age
-        target_nominal_finish = target_real_at_finish * ((1 + infl_rate) ** years_total_horizon)
-        
-        # Simulate the bridge period (Barista phase)
-        # We withdraw ONLY the gap. Contributions are 0 (assuming Barista covers living + gap draw)
-        final_bal = simulate_period_exact(
-            start_balance_nominal=start_bal,
-            start_age=age,
-            end_age=barista_until_age,
-            current_age=current_age,
-            annual_rates_full=annual_rates_by_year_full,
-            annual_expense_real=gap, # Withdrawal is just the gap (Spend - Income)
-            monthly_contrib_real=0.0,
-            infl_rate=infl_rate,
-            tax_rate=0.0, # Simplified
-            early_withdrawal_tax_rate=early_withdrawal_tax_rate,
-            use_yearly_compounding=use_yearly_compounding
-        )
-        
-        if final_bal >= target_nominal_finish:
-            return age, target_real_at_finish # Return the Full Target they hit at the end
+    last_age = min(barista_until_age, current_age + len(df_full) - 1)
+    cand_ages = np.arange(current_age, last_age + 1)
+    start_bals = df_full["StartBalance"].to_numpy()[:len(cand_ages)].copy()
+    if len(cand_ages):
+        start_bals[0] = start_balance_input
+    
+    # Simulate the bridge period (Barista phase) for every candidate at once
+    # We withdraw ONLY the gap. Contributions are 0 (assuming Barista covers living + gap draw)
+    final_bals = _bridge_final_balances(
+        start_balances=start_bals,
+        start_ages=cand_ages,
+        end_age=barista_until_age,
+        current_age=current_age,
+        annual_rates_full=annual_rates_by_year_full,
+        annual_expense_real=gap, # Withdrawal is just the gap (Spend - Income)
+        monthly_contrib_real=0.0,
+        infl_rate=infl_rate,
+        tax_rate=0.0, # Simplified
+        early_withdrawal_tax_rate=early_withdrawal_tax_rate,
+        use_yearly_compounding=use_yearly_compounding
+    )
+    
+    # Earliest candidate that still hits the Full Target at the end
+    hits = final_bals >= target_nominal_finish
+    if hits.any():
+        return int(cand_ages[hits.argmax()]), target_real_at_finish
             
     return None, target_real_at_finish
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def compute_coast_fi_age(
     df_full, current_age, start_balance_input, fi_annual_spend_today,
     infl_rate, base_swr, retirement_age, annual_rates_by_year_full
@@ -294,14 +318,18 @@ def compute_coast_fi_age(
     # Target Nominal at Age 60
     target_nominal_at_60 = target_real * ((1 + infl_rate) ** years_to_access)
     
-    # Map Age -> Nominal Start Balance (from Working Scenario)
-    balance_map = {row.Age: row.StartBalance for row in df_full.itertuples()}
-    balance_map[current_age] = start_balance_input
+    # Age / Nominal Start Balance columns (from Working Scenario) as plain lists;
+    # the first row is current_age, which uses the input balance
+    ages = df_full["Age"].to_numpy().tolist()
+    start_bals = df_full["StartBalance"].to_numpy().tolist()
+    if start_bals:
+        start_bals[0] = start_balance_input
     
-    for age in range(current_age, retirement_age + 1):
-        if age not in balance_map: continue
-        
-        start_bal = balance_map[age]
+    # Scalar compounding loop below; plain floats beat NumPy scalars there
+    rates_list = np.asarray(annual_rates_by_year_full, dtype=np.float64).tolist()
+    
+    for age, start_bal in zip(ages, start_bals):
+        if age > retirement_age: break
         
         # Simulate purely purely growth (no contribs, no draws) from 'age' to '60'
         # We assume Coast means you cover expenses with active income, so net draw is 0.
@@ -320,8 +348,8 @@ def compute_coast_fi_age(
         for k in range(sim_years):
             # year index in global array
             y_idx = (age - current_age) + k
-            if y_idx < len(annual_rates_by_year_full):
-                r = annual_rates_by_year_full[y_idx]
+            if y_idx < len(rates_list):
+                r = rates_list[y_idx]
                 bal_sim *= (1 + r)
         
         if bal_sim >= target_nominal_at_60:
@@ -366,6 +394,10 @@ def total_tax_on_earned(income, state_tax_rate):
 # =========================================================
 # Income / expense schedule
 # =========================================================
+# Cached like compound_schedule. InvestableNominalMonthly does not depend on
+# show_real, so the contribution schedule (and every simulation fed by it)
+# is identical whichever dollar view is selected.
+@st.cache_data(show_spinner=False, max_entries=32)
 def build_income_schedule(
     current_age,
     retirement_age,
@@ -379,8 +411,18 @@ def build_income_schedule(
     state_tax_rate=0.0,
     promotions=None 
 ):
-    years = retirement_age - current_age
-    rows = []
+    years = max(retirement_age - current_age, 0)
+    # Per-year outputs, filled in place and handed to pandas as whole columns
+    income_pre = np.empty(years)
+    tax = np.empty(years)
+    income_post = np.empty(years)
+    expense = np.empty(years)
+    investable = np.empty(years)
+    investable_nominal = np.empty(years)
+    savings_rate = np.empty(years)
+    # Start-of-year inflation and expense-growth factors for every year at once
+    infl_factors = ((1 + infl_rate) ** np.arange(years)).tolist()
+    expense_growth = ((1 + expense_growth_rate) ** np.arange(years)).tolist()
     
     current_nominal_income = start_income
 
@@ -395,7 +437,7 @@ def build_income_schedule(
             current_nominal_income *= (1 + bump)
 
         if infl_rate > 0:
-            df_y = (1 + infl_rate) ** y
+            df_y = infl_factors[y]
             income_real_economic = current_nominal_income / df_y
         else:
             df_y = 1.0
@@ -403,7 +445,7 @@ def build_income_schedule(
 
         tax_real_economic = total_tax_on_earned(income_real_economic, state_tax_rate)
         after_tax_income_real_economic = max(income_real_economic - tax_real_economic, 0.0)
-        expense_real_base_economic = expense_today * ((1 + expense_growth_rate) ** y)
+        expense_real_base_economic = expense_today * expense_growth[y]
 
         if savings_rate_override > 0:
             investable_real_economic = after_tax_income_real_economic * savings_rate_override
@@ -430,21 +472,29 @@ def build_income_schedule(
         else:
             savings_rate_actual = 0.0
 
-        rows.append(
-            {
-                "YearIndex": y,
-                "Age": age,
-                "IncomeRealBeforeTax": display_income_pre,
-                "TaxReal": display_tax,
-                "IncomeRealAfterTax": display_income_post,
-                "ExpensesReal": display_expense,
-                "InvestableRealAnnual": display_investable,
-                "InvestableRealMonthly": display_investable / 12.0,
-                "SavingsRate": savings_rate_actual,
-            }
-        )
-
-    return pd.DataFrame(rows)
+        income_pre[y] = display_income_pre
+        tax[y] = display_tax
+        income_post[y] = display_income_post
+        expense[y] = display_expense
+        investable[y] = display_investable
+        investable_nominal[y] = investable_real_economic * df_y
+        savings_rate[y] = savings_rate_actual
+
+    year_idx = np.arange(years)
+    return pd.DataFrame(
+        {
+            "YearIndex": year_idx,
+            "Age": current_age + year_idx,
+            "IncomeRealBeforeTax": income_pre,
+            "TaxReal": tax,
+            "IncomeRealAfterTax": income_post,
+            "ExpensesReal": expense,
+            "InvestableRealAnnual": investable,
+            "InvestableRealMonthly": investable / 12.0,
+            "InvestableNominalMonthly": investable_nominal / 12.0,
+            "SavingsRate": savings_rate,
+        }
+    )
 
 
 # =========================================================
@@ -458,6 +508,216 @@ def glide_path_return(age, base_return):
     else: return base_return - 0.015
 
 
+# =========================================================
+# Charts
+# =========================================================
+# Figures are cached on the plotted data, so reruns that leave the
+# projection unchanged skip rebuilding and validating the traces.
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_networth_fig(df_p):
+    # Traces are collected first and handed to go.Figure once, so Plotly
+    # validates the data tuple a single time instead of once per add_trace
+    ages = df_p["Age"].to_numpy()
+    traces = [
+        # Main Balance
+        go.Bar(
+            x=ages, y=df_p["Balance"].to_numpy(), 
+            name="Invested Assets (Start of Year)",
+            marker_color='rgba(58, 110, 165, 0.8)', # Strong Blue
+            hovertemplate="$%{y:,.0f}"
+        ),
+        # Home Equity
+        go.Bar(
+            x=ages, y=df_p["HomeEquity"].to_numpy(), 
+            name="Home Equity (Start of Year)",
+            marker_color='rgba(167, 173, 178, 0.5)', # Grey
+            hovertemplate="$%{y:,.0f}"
+        ),
+    ]
+    
+    # First age at or above $1M (NetWorth can dip after retirement, so this is a
+    # first-True scan rather than a sorted search)
+    net_worth = df_p["NetWorth"].to_numpy()
+    hits = net_worth >= 1000000
+    if hits.any():
+        m_idx = int(hits.argmax())
+        traces.append(go.Scatter(
+            x=[ages[m_idx]],
+            y=[net_worth[m_idx]],
+            mode="markers+text",
+            name="Hit $1M",
+            text=["Hit $1M!"],
+            textposition="top center",
+            marker=dict(color="#D32F2F", size=15, symbol="circle"),
+            showlegend=False
+        ))
+
+    fig = go.Figure(data=traces)
+    
+    if not df_p.empty:
+        final_row = df_p.iloc[-1]
+        fig.add_annotation(
+            x=final_row["Age"],
+            y=final_row["NetWorth"],
+            text=f"<b>${final_row['NetWorth']:,.0f}</b>",
+            showarrow=True,
+            arrowhead=2,
+            arrowsize=1,
+            arrowwidth=2,
+            ax=0,
+            ay=-40,
+            font=dict(size=16, color="black"),
+            bgcolor="rgba(255,255,255,0.8)",
+            bordercolor="black",
+            borderwidth=1
+        )
+    
+    fig.update_layout(
+        # UPDATED TITLE SIZE AND BOLDNESS
+        title=dict(text="<b>Net Worth Projection (Start of Year)</b>", font=dict(size=20)),
+        xaxis_title="Age (Start of Year)", yaxis_title="Value ($)",
+        barmode='stack',
+        hovermode="x unified",
+        legend=dict(orientation="h", y=1.02, x=0.01),
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=380, # Slightly smaller height to ensure fit
+        yaxis=dict(tickformat=",.0f")
+    )
+    
+    return fig
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_risk_cone_fig(df_cone_p):
+    ages = df_cone_p["Age"].to_numpy()
+    fig_cone = go.Figure(data=[
+        go.Scatter(x=ages, y=df_cone_p["Bull"].to_numpy(), mode='lines', line=dict(width=0), name="Bull (+1%)", showlegend=False, hovertemplate="$%{y:,.0f}"),
+        go.Scatter(x=ages, y=df_cone_p["Bear"].to_numpy(), mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(200,200,200,0.3)', name="Range", hovertemplate="$%{y:,.0f}"),
+        go.Scatter(x=ages, y=df_cone_p["NetWorth"].to_numpy(), mode='lines', line=dict(color='#3A6EA5', width=2), name="Base Case", hovertemplate="$%{y:,.0f}"),
+    ])
+    
+    fig_cone.update_layout(height=300, margin=dict(t=20, b=20, l=20, r=20), hovermode="x unified", yaxis=dict(tickformat=",.0f"))
+    return fig_cone
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_income_expense_fig(ages, gross, net, expenses, vline_age=None):
+    fig_i = go.Figure(data=[
+        # Gross Income Line
+        go.Scatter(
+            x=ages, 
+            y=gross, 
+            name="Gross Income", 
+            line=dict(color="#B0BEC5", dash="dot", width=2), 
+            hovertemplate="$%{y:,.0f}"
+        ),
+        # Net Income Line
+        go.Scatter(
+            x=ages, 
+            y=net, 
+            name="Net Income", 
+            line=dict(color="#66BB6A", width=3), 
+            hovertemplate="$%{y:,.0f}"
+        ),
+        # Expense Line
+        go.Scatter(
+            x=ages, 
+            y=expenses, 
+            name="Total Spending", 
+            line=dict(color="#EF5350", width=3), 
+            hovertemplate="$%{y:,.0f}"
+        ),
+    ])
+
+    # Visual marker for Barista/Retirement transition
+    if vline_age is not None:
+        fig_i.add_vline(x=vline_age, line_width=1, line_dash="dash", line_color="grey")
+
+    fig_i.update_layout(
+        height=300, 
+        margin=dict(t=30, b=20, l=20, r=20), 
+        yaxis=dict(tickformat=",.0f"),
+        legend=dict(orientation="h", y=1.1, x=0)
+    )
+    return fig_i
+
+
+# =========================================================
+# Tables
+# =========================================================
+# Column lists and display formats are static, so they are built once at
+# import. Formats are column_config entries rather than a Styler, so the
+# browser formats the cells instead of pandas calling a formatter per cell
+# on every rerun.
+DOLLAR_COL = st.column_config.NumberColumn(format="$%,.0f")
+AGE_COL = st.column_config.NumberColumn(format="%d")
+
+NET_WORTH_TABLE_COLS = ["Age", "Balance", "HomeEquity", "NetWorth"]
+NET_WORTH_TABLE_CONFIG = {
+    "Balance": DOLLAR_COL,
+    "HomeEquity": DOLLAR_COL, 
+    "NetWorth": DOLLAR_COL,
+    "Age": AGE_COL
+}
+
+# UPDATED COLUMN ORDERING AS REQUESTED
+AUDIT_TABLE_COLS = [
+    "Age", 
+    "StartBalance",
+    "AnnualRate",
+    "InvestGrowthYear",
+    "ContribYear", 
+    # "TotalPortfolioDraw", # Removed to reduce clutter in favor of itemized list
+    "EndBalance",
+    "TotalSpending",
+    "LivingWithdrawal", 
+    "TaxPenalty", 
+    "KidCost", 
+    "CarCost", 
+    "HomeCost",
+    "ScenarioActiveIncome"
+]
+AUDIT_TABLE_CONFIG = {
+    "StartBalance": DOLLAR_COL,
+    "EndBalance": DOLLAR_COL,
+    "LivingWithdrawal": DOLLAR_COL,
+    "TaxPenalty": DOLLAR_COL,
+    "KidCost": DOLLAR_COL,
+    "CarCost": DOLLAR_COL,
+    "HomeCost": DOLLAR_COL,
+    "ScenarioActiveIncome": DOLLAR_COL,
+    "InvestGrowthYear": DOLLAR_COL,
+    "ContribYear": DOLLAR_COL,
+    "TotalSpending": DOLLAR_COL,
+    "AnnualRate": st.column_config.NumberColumn(format="percent"),
+    "Age": AGE_COL
+}
+
+
+# =========================================================
+# KPI cards
+# =========================================================
+# Card markup is fixed; only the text slots change between reruns
+KPI_CARD_HTML = (
+    '<div class="kpi-card">'
+    '<div class="kpi-title">{title}</div>'
+    '<div class="kpi-value">{value}</div>'
+    '{sub_html}'
+    '<div class="kpi-subtitle">{desc}</div>'
+    '</div>'
+)
+KPI_CARD_SUB_HTML = "<div style='font-size:12px; font-weight:600; color:#2E7D32; margin-top:2px;'>{sub_value}</div>"
+
+def render_card(col, title, value, desc, sub_value=None):
+    sub_html = KPI_CARD_SUB_HTML.format(sub_value=sub_value) if sub_value else ""
+    html_content = KPI_CARD_HTML.format(
+        title=title,
+        value=value,
+        sub_html=sub_html,
+        desc=desc if len(desc) <= 60 else desc[:57] + "...",
+    )
+    with col:
+        st.markdown(html_content, unsafe_allow_html=True)
+
+
 # =========================================================
 # Main app (REDESIGNED)
 # =========================================================
@@ -595,7 +855,6 @@ def main():
         include_home = st.checkbox("Include Home Strategy", False) # Default OFF
         # Default Home vars
         home_price_today = 0
-        home_equity_by_year_full = [] 
         
         # Home Inputs logic
         if include_home:
@@ -610,8 +869,8 @@ def main():
                 base_price = current_home_value_today
                 purchase_idx = 0
                 loan = max(base_price - equity_amount_now, 0.0)
-                np = years_remaining_loan * 12
-                mp = (loan * (mortgage_rate/12) / (1 - (1+mortgage_rate/12)**(-np))) if mortgage_rate > 0 else loan/np
+                n_payments = years_remaining_loan * 12
+                mp = (loan * (mortgage_rate/12) / (1 - (1+mortgage_rate/12)**(-n_payments))) if mortgage_rate > 0 else loan/n_payments
             else:
                 home_price_today = st.number_input("Target Price ($)", value=350000)
                 planned_purchase_age = st.number_input("Buy Age", value=current_age+2, min_value=current_age)
@@ -623,8 +882,8 @@ def main():
                 purchase_idx = max(0, planned_purchase_age - current_age - 1)
                 purch_price = base_price
                 loan = purch_price * (1.0 - down_payment_pct)
-                np = mortgage_term_years * 12
-                mp = (loan * (mortgage_rate/12) / (1 - (1+mortgage_rate/12)**(-np))) if mortgage_rate > 0 else 0.0
+                n_payments = mortgage_term_years * 12
+                mp = (loan * (mortgage_rate/12) / (1 - (1+mortgage_rate/12)**(-n_payments))) if mortgage_rate > 0 else 0.0
             
             # Maintenance & Apprec defaults
             maintenance_pct = 0.01
@@ -714,61 +973,62 @@ def main():
 
     max_sim_age = 90
     years_full = max_sim_age - current_age
-    annual_rates_by_year_full = [glide_path_return(current_age + y, annual_rate_base) for y in range(years_full)]
-
-    # Contributions
-    monthly_contrib_by_year_full = []
-    for y in range(years_full):
-        if (current_age + y) < retirement_age and y < len(df_income):
-            c_real = df_income.loc[y, "InvestableRealMonthly"]
-            val = c_real * ((1 + infl_rate) ** y) if (show_real and infl_rate > 0) else c_real
-        else:
-            val = 0.0
-        monthly_contrib_by_year_full.append(val)
+    # Inflation factors (1+infl)^k for k = 0..years_full+1, shared by every
+    # nominal <-> real conversion below
+    infl_pow = (1 + infl_rate) ** np.arange(years_full + 2)
+    # Real-dollar view is only a different view when there is inflation to remove
+    deflate = show_real and infl_rate > 0
+    # Year offsets and start-of-year ages for every simulated year, shared by
+    # the rate, expense, home and chart schedules below
+    year_idx = np.arange(years_full)
+    ages = current_age + year_idx
+    # Glide path as one float64 array (one glide_path_return call per age)
+    annual_rates_by_year_full = np.array(
+        [glide_path_return(age, annual_rate_base) for age in ages.tolist()], dtype=np.float64
+    )
+
+    # Contributions (only while working, and only for years the income schedule covers)
+    n_contrib = max(0, min(years_full, len(df_income), retirement_age - current_age))
+    monthly_contrib_by_year_full = np.zeros(years_full)
+    monthly_contrib_by_year_full[:n_contrib] = df_income["InvestableNominalMonthly"].to_numpy()[:n_contrib]
 
     # Base Expenses (Kids, Cars, Housing)
-    annual_expense_by_year_nominal_full = [0.0] * years_full
-    
-    # Tracking specific expense buckets
-    exp_kids_nominal = [0.0] * years_full
-    exp_cars_nominal = [0.0] * years_full
-    exp_housing_nominal = [0.0] * years_full
+    # Built as whole-horizon arrays: each year y is the expense for age
+    # current_age + y + 1, inflated by (1+inf)^(y+1)
+    exp_ages = ages + 1
+    infl_next = infl_pow[1:years_full + 1]
 
-    home_price_by_year_full = [0.0] * years_full
-    home_equity_by_year_full = [0.0] * years_full
-    housing_adj_by_year_full = [0.0] * years_full
+    # Tracking specific expense buckets
+    exp_kids_nominal = np.zeros(years_full)
+    exp_cars_nominal = np.zeros(years_full)
+    exp_housing_nominal = np.zeros(years_full)
+    exp_other_nominal = np.zeros(years_full)
+    maint_cost = np.zeros(years_full)
+
+    home_price_by_year_full = np.zeros(years_full)
+    home_equity_by_year_full = np.zeros(years_full)
+    housing_adj_by_year_full = np.zeros(years_full)
     start_balance_effective = start_balance_input
 
     # Expense Injection Logic
-    for y in range(years_full):
-        age = current_age + y + 1
-        
-        # Kids Logic
-        if use_kid:
-            total_kids_cost_now = 0.0
-            for k in range(int(num_kids)):
-                k_start = kids_start_age + (k * kid_spacing)
-                k_end = k_start + support_years
-                if k_start <= age < k_end:
-                    total_kids_cost_now += annual_cost_per_kid_today
-            
-            if total_kids_cost_now > 0:
-                cost_nom = total_kids_cost_now * ((1+infl_rate)**(y+1))
-                annual_expense_by_year_nominal_full[y] += cost_nom
-                exp_kids_nominal[y] += cost_nom
-
-        if use_car and (age >= first_car_age) and (age - first_car_age) % car_interval_years == 0:
-            cost_nom = car_cost_today * ((1+infl_rate)**(y+1))
-            annual_expense_by_year_nominal_full[y] += cost_nom
-            exp_cars_nominal[y] += cost_nom
+    # Kids Logic: count the kids being supported at each age
+    if use_kid:
+        kids_supported = np.zeros(years_full)
+        for k in range(int(num_kids)):
+            k_start = kids_start_age + (k * kid_spacing)
+            k_end = k_start + support_years
+            kids_supported += (exp_ages >= k_start) & (exp_ages < k_end)
+        exp_kids_nominal = kids_supported * annual_cost_per_kid_today * infl_next
+
+    if use_car:
+        car_due = (exp_ages >= first_car_age) & ((exp_ages - first_car_age) % car_interval_years == 0)
+        exp_cars_nominal = np.where(car_due, car_cost_today * infl_next, 0.0)
+
 # --- NEW: OTHER LUMPY EXPENSE LOGIC ---
-        if age == other_expense_1_age and other_expense_1_val > 0:
-            cost_nom = other_expense_1_val * ((1+infl_rate)**(y+1))
-            annual_expense_by_year_nominal_full[y] += cost_nom
-            
-        if age == other_expense_2_age and other_expense_2_val > 0:
-            cost_nom = other_expense_2_val * ((1+infl_rate)**(y+1))
-            annual_expense_by_year_nominal_full[y] += cost_nom
+    if other_expense_1_val > 0:
+        exp_other_nominal += np.where(exp_ages == other_expense_1_age, other_expense_1_val * infl_next, 0.0)
+    if other_expense_2_val > 0:
+        exp_other_nominal += np.where(exp_ages == other_expense_2_age, other_expense_2_val * infl_next, 0.0)
     # Home Logic Execution
     if include_home:
         # Re-calc Purchase logic for loop
@@ -779,45 +1039,46 @@ def main():
             else:
                 if purchase_idx < years_full:
                     cost_nom = (purch_price * down_payment_pct)
-                    annual_expense_by_year_nominal_full[purchase_idx] += cost_nom
                     exp_housing_nominal[purchase_idx] += cost_nom
             
             if mp > 0:
                 housing_delta = (mp + est_prop_tax_monthly - current_rent) * 12
-                for y in range(purchase_idx, years_full):
-                    housing_adj_by_year_full[y] = housing_delta
+                housing_adj_by_year_full[purchase_idx:] = housing_delta
         
-        # Loop for equity
-        for y in range(years_full):
-            # For START OF YEAR view, we use 'y' instead of 'y+1' for appreciation
-            # Start of Year 0 = Base Price (No growth yet)
-            years_from_now = y 
-            price_nom = base_price * ((1 + home_app_rate) ** years_from_now) if y >= purchase_idx else 0.0
-            home_price_by_year_full[y] = price_nom
-            
-            # Simple Equity Calc
-            if loan <= 0 or np == 0:
-                equity = price_nom if y >= purchase_idx else 0.0
+        # Equity by year
+        # For START OF YEAR view, we use 'y' instead of 'y+1' for appreciation
+        # Start of Year 0 = Base Price (No growth yet)
+        owned = year_idx >= purchase_idx
+        home_price_by_year_full = np.where(owned, base_price * ((1 + home_app_rate) ** year_idx), 0.0)
+        
+        # Simple Equity Calc
+        if loan <= 0 or n_payments == 0:
+            home_equity_by_year_full = home_price_by_year_full.copy()
+        else:
+            # Start of year means k payments made previously
+            k = np.clip((year_idx - purchase_idx) * 12, 0, n_payments)
+            # One scalar rate test, then straight-line array math: at k = 0 the
+            # annuity formula is exactly the loan, and before purchase the price
+            # is 0, so max(price - outstanding, 0) already gives 0 equity there
+            if mortgage_rate > 0:
+                growth_k = (1 + mortgage_rate/12) ** k
+                outstanding = loan * growth_k - mp * (growth_k - 1) / (mortgage_rate/12)
             else:
-                if y < purchase_idx: equity = 0.0
-                else:
-                    k = min((y - purchase_idx) * 12, np) # Start of year means k payments made previously
-                    outstanding = (loan * (1+mortgage_rate/12)**k - mp*((1+mortgage_rate/12)**k - 1)/(mortgage_rate/12)) if (mortgage_rate > 0 and k > 0) else max(loan - mp*k, 0.0)
-                    if k >= np: outstanding = 0.0
-                    equity = max(price_nom - outstanding, 0.0)
-            home_equity_by_year_full[y] = equity
-            
-            # Maintenance
-            if y >= purchase_idx:
-                # Maintenance is paid during the year, based on value
-                maint_cost = price_nom * maintenance_pct
-                annual_expense_by_year_nominal_full[y] += maint_cost
-                annual_expense_by_year_nominal_full[y] += maint_cost
-                exp_housing_nominal[y] += maint_cost
-
-    for y in range(years_full):
-        annual_expense_by_year_nominal_full[y] += housing_adj_by_year_full[y]
-        exp_housing_nominal[y] += housing_adj_by_year_full[y]
+                outstanding = np.maximum(loan - mp * k, 0.0)
+            # Paid off exactly (the annuity formula leaves rounding dust at N)
+            outstanding[k >= n_payments] = 0.0
+            home_equity_by_year_full = np.maximum(home_price_by_year_full - outstanding, 0.0)
+        
+        # Maintenance is paid during the year, based on value (zero before purchase)
+        maint_cost = home_price_by_year_full * maintenance_pct
+        exp_housing_nominal += maint_cost
+
+    exp_housing_nominal += housing_adj_by_year_full
+
+    # Total expense schedule, summed once from the buckets
+    annual_expense_by_year_nominal_full = (
+        exp_kids_nominal + exp_cars_nominal + exp_other_nominal + exp_housing_nominal + maint_cost
+    )
 
     # Full Simulation (Baseline)
     df_full = compound_schedule(
@@ -825,7 +1086,7 @@ def main():
         annual_expense_by_year_nominal_full, annual_rate_by_year=annual_rates_by_year_full,
         use_yearly_compounding=use_yearly
     )
-    df_full["Age"] = current_age + df_full["Year"] - 1
+    df_full["Age"] = ages  # one row per year from current_age
     # KEY CHANGE: "Balance" in our visuals will now map to "StartBalance"
     # This aligns the chart with "Start of Year" expectations.
     # We keep 'EndBalance' for logic that might need it.
@@ -917,116 +1178,64 @@ def main():
             is_early = True
 
     # --- BUILD CHART DATA (Now available for KPIs) ---
-    monthly_contrib_chart = []
-    annual_expense_chart = list(annual_expense_by_year_nominal_full) 
-    
-    detailed_income_active = []
-    detailed_expense_total = []
-    
-    det_living_withdrawal = []
-    det_tax_penalty = []
-    det_kids = []
-    det_cars = []
-    det_housing = []
-    det_total_portfolio_draw = []
-    detailed_total_spending = []
+    # Computed as whole-horizon arrays (one entry per simulated year)
+    infl_start = infl_pow[:years_full]       # Start of Year factor
+    infl_end = infl_pow[1:years_full + 1]    # End of Year factor
 
-    def to_nom(val, y_idx):
-        return val * ((1+infl_rate)**(y_idx)) if (show_real and infl_rate > 0) else val
+    working = ages < stop_age
+    retired = ~working
 
-    # RE-CALC CHART EXPENSES TO INCLUDE EARLY TAX
-    for y in range(years_full):
-        age = current_age + y
-        
-        # 1. Contributions
-        val = monthly_contrib_by_year_full[y] if age < stop_age else 0.0
-        monthly_contrib_chart.append(val)
-        
-        active_income_this_year = 0.0
-        base_need = 0.0
-        
-        # 2. Retirement Phase Expenses
-        if age >= stop_age:
-            if is_barista:
-                 if age < barista_until_age:
-                     # BARISTA PHASE
-                     active_income_this_year = barista_income_today
-                     # Use Barista specific spend
-                     base_need = max(0, barista_spend_today - barista_income_today) * ((1+infl_rate)**(y+1))
-                 else:
-                     # FULL RETIREMENT PHASE (After Barista)
-                     base_need = fi_annual_spend_today * ((1+infl_rate)**(y+1))
-                     active_income_this_year = 0.0
-            elif is_early:
-                 base_need = fi_annual_spend_today * ((1+infl_rate)**(y+1))
-            else:
-                 # Standard retirement
-                 if age < retirement_age: base_need = 0.0
-                 else: base_need = fi_annual_spend_today * ((1+infl_rate)**(y+1))
+    # 1. Contributions
+    monthly_contrib_chart = np.where(working, monthly_contrib_by_year_full, 0.0)
 
-            net_draw = base_need
-            
-            gross_withdrawal = net_draw
-            tax_penalty_amount = 0.0
-            
-            if net_draw > 0:
-                if age < 60 and early_withdrawal_tax_rate > 0:
-                    gross_withdrawal = net_draw / (1.0 - early_withdrawal_tax_rate)
-                    tax_penalty_amount = gross_withdrawal - net_draw
-            
-            annual_expense_chart[y] += gross_withdrawal
-            
-            detailed_expense_total.append(gross_withdrawal + to_nom(active_income_this_year, y))
-            detailed_income_active.append(to_nom(active_income_this_year, y))
-            
-            det_living_withdrawal.append(net_draw)
-            det_tax_penalty.append(tax_penalty_amount)
-            det_total_portfolio_draw.append(annual_expense_chart[y])
+    # 2. Retirement Phase Expenses
+    barista_phase = retired & is_barista & (ages < barista_until_age)
+    if is_barista or is_early:
+        full_ret_phase = retired & ~barista_phase
+    else:
+        # Standard retirement: nothing is drawn before Full Retirement Age
+        full_ret_phase = retired & (ages >= retirement_age)
 
-        else:
-            det_total_portfolio_draw.append(annual_expense_chart[y]) 
-            
-            if y < len(df_income):
-                val_from_table = df_income.loc[y, "IncomeRealAfterTax"]
-                if show_real and infl_rate > 0:
-                        val_nominal = val_from_table * ((1 + infl_rate) ** y)
-                else:
-                        val_nominal = val_from_table
-                
-                detailed_income_active.append(val_nominal)
-            else:
-                detailed_income_active.append(0.0)
-                
-            detailed_expense_total.append(annual_expense_chart[y])
-            det_living_withdrawal.append(0.0)
-            det_tax_penalty.append(0.0)
+    # Use Barista specific spend during the Barista phase
+    barista_gap_today = max(0, barista_spend_today - barista_income_today)
+    base_need = np.where(barista_phase, barista_gap_today * infl_end, 0.0)
+    base_need = np.where(full_ret_phase, fi_annual_spend_today * infl_end, base_need)
 
-        det_kids.append(exp_kids_nominal[y])
-        det_cars.append(exp_cars_nominal[y])
-        det_housing.append(exp_housing_nominal[y])
-        
-        # --- TOTAL SPENDING CALCULATION (Independent of Income Source) ---
-        # Calculate nominal base spending first
-        base_spending_nom = 0.0
-        
-        # Inflation factor for manual calc
-        inf_f = (1 + infl_rate) ** y
-        
-        if age < stop_age:
-             # Accumulation Phase: Use Current Expenses + Growth
-             base_spending_nom = expense_today * ((1 + expense_growth_rate) ** y) * inf_f
-        elif is_barista and age < barista_until_age:
-             # Barista Phase
-             base_spending_nom = barista_spend_today * inf_f
-        else:
-             # Retirement Phase
-             base_spending_nom = fi_annual_spend_today * inf_f
-             
-        # Add Lumpy Expenses (Already nominal) + Tax Penalty
-        # Note: TaxPenalty is calculated above in retirement logic (0 otherwise)
-        lumpy_total = exp_kids_nominal[y] + exp_cars_nominal[y] + exp_housing_nominal[y] + (det_tax_penalty[-1] if det_tax_penalty else 0.0)
-        
-        detailed_total_spending.append(base_spending_nom + lumpy_total)
+    # RE-CALC CHART EXPENSES TO INCLUDE EARLY TAX
+    gross_withdrawal = base_need.copy()
+    if early_withdrawal_tax_rate > 0:
+        penalized = (base_need > 0) & (ages < 60)
+        gross_withdrawal[penalized] = base_need[penalized] / (1.0 - early_withdrawal_tax_rate)
+
+    annual_expense_chart = annual_expense_by_year_nominal_full + gross_withdrawal
+
+    det_living_withdrawal = base_need
+    det_tax_penalty = gross_withdrawal - base_need
+    det_total_portfolio_draw = annual_expense_chart
+    det_kids = exp_kids_nominal
+    det_cars = exp_cars_nominal
+    det_housing = exp_housing_nominal
+
+    # 3. Active Income (Salary while working, Barista income during Barista phase)
+    salary_after_tax = np.zeros(years_full)
+    n_income = min(len(df_income), years_full)
+    salary_after_tax[:n_income] = df_income["IncomeRealAfterTax"].to_numpy()[:n_income]
+    detailed_income_active = np.where(working, salary_after_tax, np.where(barista_phase, barista_income_today, 0.0))
+    if deflate:
+        detailed_income_active = detailed_income_active * infl_start
+
+    # --- TOTAL SPENDING CALCULATION (Independent of Income Source) ---
+    # Accumulation Phase: Current Expenses + Growth; Barista Phase: Barista spend;
+    # Retirement Phase: Retirement spend. All nominal.
+    base_spending_nom = np.where(
+        working,
+        expense_today * ((1 + expense_growth_rate) ** year_idx),
+        np.where(barista_phase, barista_spend_today, fi_annual_spend_today)
+    ) * infl_start
+
+    # Add Lumpy Expenses (Already nominal) + Tax Penalty
+    lumpy_total = det_kids + det_cars + det_housing + det_tax_penalty
+    detailed_total_spending = base_spending_nom + lumpy_total
 
     # 4. Generate Chart DF
     df_chart = compound_schedule(
@@ -1034,29 +1243,33 @@ def main():
         annual_expense_chart, annual_rate_by_year=annual_rates_by_year_full,
         use_yearly_compounding=use_yearly
     )
-    df_chart["Age"] = current_age + df_chart["Year"] - 1
-    df_chart["Balance"] = df_chart["StartBalance"]
-    
-    df_chart["HomeEquity"] = home_equity_by_year_full
-    df_chart["NetWorth"] = df_chart["Balance"] + df_chart["HomeEquity"]
-    
-    df_chart["ScenarioActiveIncome"] = detailed_income_active
-    df_chart["TotalPortfolioDraw"] = det_total_portfolio_draw
-    df_chart["LivingWithdrawal"] = det_living_withdrawal
-    df_chart["TaxPenalty"] = det_tax_penalty
-    df_chart["KidCost"] = det_kids
-    df_chart["CarCost"] = det_cars
-    df_chart["HomeCost"] = det_housing
-    df_chart["TotalSpending"] = detailed_total_spending
+    # Scenario columns are attached in one assign (one frame rebuild, not one per column)
+    balance_chart = df_chart["StartBalance"].to_numpy()
+    df_chart = df_chart.assign(
+        Age=ages,
+        Balance=balance_chart,
+        HomeEquity=home_equity_by_year_full,
+        NetWorth=balance_chart + home_equity_by_year_full,
+        ScenarioActiveIncome=detailed_income_active,
+        TotalPortfolioDraw=det_total_portfolio_draw,
+        LivingWithdrawal=det_living_withdrawal,
+        TaxPenalty=det_tax_penalty,
+        KidCost=det_kids,
+        CarCost=det_cars,
+        HomeCost=det_housing,
+        TotalSpending=detailed_total_spending,
+    )
 
     # Real Adjustment
-    if show_real and infl_rate > 0:
-        # For Start of Year adjustments, we deflate by (1+inf)^year_idx
-        df_chart["DF"] = (1+infl_rate)**(df_chart["Year"] - 1)
-        for c in ["Balance", "HomeEquity", "NetWorth", "AnnualExpense", "StartBalance", "EndBalance"]:
-            df_chart[c] /= df_chart["DF"]
-        for c in ["ScenarioActiveIncome", "TotalPortfolioDraw", "LivingWithdrawal", "TaxPenalty", "KidCost", "CarCost", "HomeCost", "InvestGrowthYear", "ContribYear", "TotalSpending"]:
-            df_chart[c] /= df_chart["DF"]
+    if deflate:
+        # For Start of Year adjustments, we deflate by (1+inf)^year_idx (infl_start)
+        real_cols = [
+            "Balance", "HomeEquity", "NetWorth", "AnnualExpense", "StartBalance", "EndBalance",
+            "ScenarioActiveIncome", "TotalPortfolioDraw", "LivingWithdrawal", "TaxPenalty",
+            "KidCost", "CarCost", "HomeCost", "InvestGrowthYear", "ContribYear", "TotalSpending"
+        ]
+        # One broadcast divide over the whole block instead of a Series op per column
+        df_chart[real_cols] = df_chart[real_cols].to_numpy() / infl_start[:, None]
 
     # --- DYNAMIC FUTURE INCOME KPI ---
     
@@ -1068,34 +1281,20 @@ def main():
         full_ret_start_age = stop_age
     
     # 2. Get Balance at that age from df_chart
-    # We look for the row where Age == full_ret_start_age
-    row_at_ret = df_chart[df_chart["Age"] == full_ret_start_age]
+    # Rows are one per age starting at current_age, so Age == full_ret_start_age
+    # lives at position full_ret_start_age - current_age
+    ret_idx = full_ret_start_age - current_age
     
     future_income_val = 0.0
     future_swr_used = 0.0
     
-    if not row_at_ret.empty:
-        final_balance = row_at_ret.iloc[0]["Balance"] # Already Real/Nominal adjusted by loop above
+    if 0 <= ret_idx < len(df_chart):
+        final_balance = df_chart["Balance"].iat[ret_idx] # Already Real/Nominal adjusted by loop above
         future_swr_used = get_dynamic_swr(full_ret_start_age, base_swr_30yr)
         future_income_val = final_balance * future_swr_used
         
     # --- TOP ROW: THE VERDICT (Redesigned for Single Screen) ---
     
-    def render_card(col, title, value, desc, sub_value=None):
-        sub_html = f"<div style='font-size:12px; font-weight:600; color:#2E7D32; margin-top:2px;'>{sub_value}</div>" if sub_value else ""
-        
-        html_content = (
-            f'<div class="kpi-card">'
-            f'<div class="kpi-title">{title}</div>'
-            f'<div class="kpi-value">{value}</div>'
-            f'{sub_html}'
-            f'<div class="kpi-subtitle">{textwrap.shorten(desc, width=60, placeholder="...")}</div>'
-            f'</div>'
-        )
-        
-        with col:
-            st.markdown(html_content, unsafe_allow_html=True)
-
     with kpi_container:
         # Layout: 3 Equal Columns
         c1, c2, c3 = st.columns(3)
@@ -1114,15 +1313,14 @@ def main():
         val_bar = str(barista_age) if barista_age else "N/A"
         color_bar = "#0D47A1" if barista_age else "#CC0000"
         if barista_age:
-            row_b = df_full[df_full["Age"] == barista_age]
-            if not row_b.empty:
+            y_idx = barista_age - current_age
+            if 0 <= y_idx < len(df_full):
                 # Calculate Nominal Gap
                 gap_real = max(0, barista_spend_today - barista_income_today)
-                y_idx = barista_age - current_age
-                gap_nom = gap_real * ((1 + infl_rate) ** y_idx)
+                gap_nom = gap_real * infl_pow[y_idx]
                 
                 # Nominal Balance at start of that year
-                bal_nom = row_b.iloc[0]["StartBalance"]
+                bal_nom = df_full["StartBalance"].iat[y_idx]
                 
                 eff_swr = (gap_nom / bal_nom) if bal_nom > 0 else 0.0
                 desc_bar = f"Gap SWR: {eff_swr*100:.2f}%. Work until {barista_until_age}."
@@ -1153,71 +1351,15 @@ def main():
         plot_end = max(retirement_age, full_ret_start_age)
         if plot_end > max_sim_age: plot_end = max_sim_age
         
-        df_p = df_chart[df_chart["Age"] <= plot_end].reset_index(drop=True)
-        
-        fig = go.Figure()
-        # Main Balance
-        fig.add_trace(go.Bar(
-            x=df_p["Age"], y=df_p["Balance"], 
-            name="Invested Assets (Start of Year)",
-            marker_color='rgba(58, 110, 165, 0.8)', # Strong Blue
-            hovertemplate="$%{y:,.0f}"
-        ))
-        # Home Equity
-        fig.add_trace(go.Bar(
-            x=df_p["Age"], y=df_p["HomeEquity"], 
-            name="Home Equity (Start of Year)",
-            marker_color='rgba(167, 173, 178, 0.5)', # Grey
-            hovertemplate="$%{y:,.0f}"
-        ))
-        
-        milestone = df_p[df_p["NetWorth"] >= 1000000]
-        if not milestone.empty:
-            m_row = milestone.iloc[0]
-            fig.add_trace(go.Scatter(
-                x=[m_row["Age"]],
-                y=[m_row["NetWorth"]],
-                mode="markers+text",
-                name="Hit $1M",
-                text=["Hit $1M!"],
-                textposition="top center",
-                marker=dict(color="#D32F2F", size=15, symbol="circle"),
-                showlegend=False
-            ))
-        
-        if not df_p.empty:
-            final_row = df_p.iloc[-1]
-            fig.add_annotation(
-                x=final_row["Age"],
-                y=final_row["NetWorth"],
-                text=f"<b>${final_row['NetWorth']:,.0f}</b>",
-                showarrow=True,
-                arrowhead=2,
-                arrowsize=1,
-                arrowwidth=2,
-                ax=0,
-                ay=-40,
-                font=dict(size=16, color="black"),
-                bgcolor="rgba(255,255,255,0.8)",
-                bordercolor="black",
-                borderwidth=1
-            )
+        # df_chart has one row per age starting at current_age, so "Age <= plot_end"
+        # is exactly its first n_plot rows; every tab reuses this positional slice
+        n_plot = max(0, plot_end - current_age + 1)
+        df_p = df_chart.iloc[:n_plot]
         
         target_val = fi_target_bal
-        if show_real and infl_rate > 0: target_val = fi_annual_spend_today / base_swr_30yr
-        
-        fig.update_layout(
-            # UPDATED TITLE SIZE AND BOLDNESS
-            title=dict(text="<b>Net Worth Projection (Start of Year)</b>", font=dict(size=20)),
-            xaxis_title="Age (Start of Year)", yaxis_title="Value ($)",
-            barmode='stack',
-            hovermode="x unified",
-            legend=dict(orientation="h", y=1.02, x=0.01),
-            margin=dict(l=20, r=20, t=40, b=20),
-            height=380, # Slightly smaller height to ensure fit
-            yaxis=dict(tickformat=",.0f")
-        )
+        if deflate: target_val = fi_annual_spend_today / base_swr_30yr
         
+        fig = build_networth_fig(df_p[["Age", "Balance", "HomeEquity", "NetWorth"]])
         st.plotly_chart(fig, use_container_width=True)
         
     with control_col:
@@ -1231,268 +1373,168 @@ def main():
             st.caption(f"Work until: Age {retirement_age}")
 
     # --- TABS FOR DETAILS ---
-    tab1, tab2, tab3, tab4 = st.tabs(["Risk Analysis", "Cash Flow Details", "Net Worth Table", "Audit Table"])
+    # on_change="rerun" makes each tab report .open, so only the active tab's
+    # figures and tables are built on a rerun.
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["Risk Analysis", "Cash Flow Details", "Net Worth Table", "Audit Table"],
+        key="detail_tab",
+        on_change="rerun",
+    )
     
-    with tab1:
-        st.caption("How market volatility (+/- 1% annual return) impacts your outcome.")
-        rates_bear = [r - 0.01 for r in annual_rates_by_year_full]
-        rates_bull = [r + 0.01 for r in annual_rates_by_year_full]
-        
-        df_bear = compound_schedule(start_balance_effective, years_full, monthly_contrib_chart, annual_expense_chart, annual_rate_by_year=rates_bear, use_yearly_compounding=use_yearly)
-        df_bull = compound_schedule(start_balance_effective, years_full, monthly_contrib_chart, annual_expense_chart, annual_rate_by_year=rates_bull, use_yearly_compounding=use_yearly)
-        
-        for df_ in [df_bear, df_bull]:
-            df_["Age"] = current_age + df_["Year"] - 1
-            df_["NW"] = df_["StartBalance"] + home_equity_by_year_full
-            if show_real and infl_rate > 0:
-                df_["NW"] /= ((1+infl_rate)**(df_["Year"]-1))
-        
-        df_bear_p = df_bear[df_bear["Age"] <= plot_end]
-        df_bull_p = df_bull[df_bull["Age"] <= plot_end]
-        
-        fig_cone = go.Figure()
-        fig_cone.add_trace(go.Scatter(x=df_bull_p["Age"], y=df_bull_p["NW"], mode='lines', line=dict(width=0), name="Bull (+1%)", showlegend=False, hovertemplate="$%{y:,.0f}"))
-        fig_cone.add_trace(go.Scatter(x=df_bear_p["Age"], y=df_bear_p["NW"], mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(200,200,200,0.3)', name="Range", hovertemplate="$%{y:,.0f}"))
-        fig_cone.add_trace(go.Scatter(x=df_p["Age"], y=df_p["NetWorth"], mode='lines', line=dict(color='#3A6EA5', width=2), name="Base Case", hovertemplate="$%{y:,.0f}"))
-        
-        fig_cone.update_layout(height=300, margin=dict(t=20, b=20, l=20, r=20), hovermode="x unified", yaxis=dict(tickformat=",.0f"))
-        st.plotly_chart(fig_cone, use_container_width=True)
-
-    with tab2:
-        c1, c2 = st.columns(2)
-        with c1:
-            st.markdown("**Income vs Expenses (Scenario)**")
+    if tab1.open:
+        with tab1:
+            st.caption("How market volatility (+/- 1% annual return) impacts your outcome.")
+            # Bear/Bull: same cash flows with every year's return shifted -/+ 1%.
+            # Only Start of Year balances are needed, so run the kernel directly
+            # on both shifted rate rows at once instead of building two schedules.
+            shifted_rates = annual_rates_by_year_full + np.array([[-0.01], [0.01]])
+            nw_bear, nw_bull = _compound_kernel(start_balance_effective, monthly_contrib_chart, annual_expense_chart, shifted_rates, use_yearly)[0] + home_equity_by_year_full
+            if deflate:
+                nw_bear /= infl_start
+                nw_bull /= infl_start
+        
+            df_cone_p = pd.DataFrame({
+                "Age": df_p["Age"],
+                "Bear": nw_bear[:n_plot],
+                "Bull": nw_bull[:n_plot],
+                "NetWorth": df_p["NetWorth"],
+            })
+            fig_cone = build_risk_cone_fig(df_cone_p)
+            st.plotly_chart(fig_cone, use_container_width=True)
+
+    if tab2.open:
+        with tab2:
+            c1, c2 = st.columns(2)
+            with c1:
+                st.markdown("**Income vs Expenses (Scenario)**")
             
-            # --- CUSTOM LOGIC FOR GRAPH INCOME & EXPENSES ---
-            # We reconstruct the lines based on the SCENARIO (Work vs Barista vs Early),
-            # ensuring Barista income is treated as Pre-Tax.
+                # --- CUSTOM LOGIC FOR GRAPH INCOME & EXPENSES ---
+                # We reconstruct the lines based on the SCENARIO (Work vs Barista vs Early),
+                # ensuring Barista income is treated as Pre-Tax.
             
-            base_expenses_plot = []
-            graph_gross_income = []
-            graph_net_income = []
+                # Per-year outputs, one row per df_chart row
+                n_rows = len(df_chart)
+            
+                # df_income cols are already adjusted for show_real/nominal preference
+                # (working years past the income table show no income)
+                n_inc = min(len(df_income), n_rows)
+                work_gross = np.zeros(n_rows)
+                work_net = np.zeros(n_rows)
+                work_gross[:n_inc] = df_income["IncomeRealBeforeTax"].to_numpy()[:n_inc]
+                work_net[:n_inc] = df_income["IncomeRealAfterTax"].to_numpy()[:n_inc]
+            
+                # User input 'barista_income_today' is treated as PRE-TAX Real (Today's $),
+                # so its tax is the same every Barista year
+                barista_gross_real = barista_income_today
+                barista_net_real = max(0, barista_gross_real - total_tax_on_earned(barista_gross_real, state_tax_rate))
+                # Real view keeps today's dollars; nominal view inflates them per year
+                barista_scale = np.ones(n_rows) if deflate else infl_pow[:n_rows]
             
-            for i, row in df_chart.iterrows():
-                age = row["Age"]
-                idx = int(row["Year"] - 1) # 0-based index
-                
-                # Inflation factor for manual adjustments if needed (Nominal conversion)
-                infl_factor_nominal = (1 + infl_rate) ** idx
-                
                 # --- 1. INCOME LOGIC ---
-                if age < stop_age:
-                    # WORKING PHASE
-                    if idx < len(df_income):
-                        # df_income cols are already adjusted for show_real/nominal preference
-                        g_val = df_income.loc[idx, "IncomeRealBeforeTax"]
-                        n_val = df_income.loc[idx, "IncomeRealAfterTax"]
-                        graph_gross_income.append(g_val)
-                        graph_net_income.append(n_val)
-                    else:
-                        graph_gross_income.append(0.0)
-                        graph_net_income.append(0.0)
-                        
-                elif is_barista and age < barista_until_age:
-                    # BARISTA PHASE
-                    # User input 'barista_income_today' is treated as PRE-TAX Real (Today's $)
-                    
-                    gross_real = barista_income_today
-                    tax_real = total_tax_on_earned(gross_real, state_tax_rate)
-                    net_real = max(0, gross_real - tax_real)
-                    
-                    if show_real and infl_rate > 0:
-                        graph_gross_income.append(gross_real)
-                        graph_net_income.append(net_real)
-                    else:
-                        graph_gross_income.append(gross_real * infl_factor_nominal)
-                        graph_net_income.append(net_real * infl_factor_nominal)
-                        
-                else:
-                    # FULL RETIREMENT PHASE
-                    graph_gross_income.append(0.0)
-                    graph_net_income.append(0.0)
+                # WORKING PHASE: salary; BARISTA PHASE: barista income;
+                # FULL RETIREMENT PHASE: none (same phase masks as the chart data)
+                graph_gross_income = np.where(
+                    working, work_gross, np.where(barista_phase, barista_gross_real * barista_scale, 0.0)
+                )
+                graph_net_income = np.where(
+                    working, work_net, np.where(barista_phase, barista_net_real * barista_scale, 0.0)
+                )
 
                 # --- 2. EXPENSE LOGIC ---
-                if age < stop_age:
-                    # Working Phase: Expense grows from 'Current Expenses'
-                    val_nom = expense_today * ((1 + expense_growth_rate) ** idx) * infl_factor_nominal
-                    base_expenses_plot.append(val_nom)
-                elif is_barista and age < barista_until_age:
-                     # Barista Phase: Use specific barista spend
-                     val_nom = barista_spend_today * infl_factor_nominal
-                     base_expenses_plot.append(val_nom)
-                else:
-                    # Retirement/Barista Phase: Expense is 'Retirement Spend' Target
-                    val_nom = fi_annual_spend_today * infl_factor_nominal
-                    base_expenses_plot.append(val_nom)
+                # Same phase rules (working growth, barista spend, retirement spend)
+                # and the same infl_start factors as base_spending_nom, so reuse it
+                # rather than re-deriving the powers year by year.
+                # Adjust Expenses for Real/Nominal settings (same infl_start factor as df_chart)
+                base_expenses_plot = base_spending_nom / infl_start if deflate else base_spending_nom
             
-            # --- PREPARE PLOTTING DATA ---
-            s_base_expenses = pd.Series(base_expenses_plot)
+                # --- PREPARE PLOTTING DATA ---
+                # Plain ndarrays, positional over df_chart's rows (no Series alignment)
+                # Add Lumpy Expenses (Kid, Car, Home) to the Base
+                total_scenario_expenses = (
+                    base_expenses_plot + 
+                    df_chart["KidCost"].to_numpy() + 
+                    df_chart["CarCost"].to_numpy() + 
+                    df_chart["HomeCost"].to_numpy() + 
+                    df_chart["TaxPenalty"].to_numpy()
+                )
             
-            # Adjust Expenses for Real/Nominal settings (using the DF column created in main)
-            if show_real and infl_rate > 0:
-                s_base_expenses /= df_chart["DF"]
-                
-            # Add Lumpy Expenses (Kid, Car, Home) to the Base
-            total_scenario_expenses = (
-                s_base_expenses + 
-                df_chart["KidCost"] + 
-                df_chart["CarCost"] + 
-                df_chart["HomeCost"] + 
-                df_chart["TaxPenalty"]
-            )
-            
-            # Slice to match the plotting range
-            df_p_graph = df_chart[df_chart["Age"] <= plot_end].reset_index(drop=True)
-            y_gross = graph_gross_income[:len(df_p_graph)]
-            y_net = graph_net_income[:len(df_p_graph)]
-            y_expenses = total_scenario_expenses[:len(df_p_graph)]
-            
-            fig_i = go.Figure()
+                # Slice to match the plotting range
+                y_gross = graph_gross_income[:n_plot]
+                y_net = graph_net_income[:n_plot]
+                y_expenses = total_scenario_expenses[:n_plot]
             
-            # Gross Income Line
-            fig_i.add_trace(go.Scatter(
-                x=df_p_graph["Age"], 
-                y=y_gross, 
-                name="Gross Income", 
-                line=dict(color="#B0BEC5", dash="dot", width=2), 
-                hovertemplate="$%{y:,.0f}"
-            ))
+                # Visual marker for Barista/Retirement transition
+                vline_age = stop_age if stop_age < plot_end else None
+                fig_i = build_income_expense_fig(
+                    df_p["Age"].to_numpy(), y_gross, y_net, y_expenses, vline_age
+                )
+                st.plotly_chart(fig_i, use_container_width=True)
             
-            # Net Income Line
-            fig_i.add_trace(go.Scatter(
-                x=df_p_graph["Age"], 
-                y=y_net, 
-                name="Net Income", 
-                line=dict(color="#66BB6A", width=3), 
-                hovertemplate="$%{y:,.0f}"
-            ))
-            
-            # Expense Line
-            fig_i.add_trace(go.Scatter(
-                x=df_p_graph["Age"], 
-                y=y_expenses, 
-                name="Total Spending", 
-                line=dict(color="#EF5350", width=3), 
-                hovertemplate="$%{y:,.0f}"
-            ))
-            
-            # Visual marker for Barista/Retirement transition
-            if stop_age < plot_end:
-                 fig_i.add_vline(x=stop_age, line_width=1, line_dash="dash", line_color="grey")
-
-            fig_i.update_layout(
-                height=300, 
-                margin=dict(t=30, b=20, l=20, r=20), 
-                yaxis=dict(tickformat=",.0f"),
-                legend=dict(orientation="h", y=1.1, x=0)
+            with c2:
+                st.markdown("**Investment Returns Glide Path**")
+                pcts = annual_rates_by_year_full[:n_plot] * 100
+                fig_r = go.Figure(data=[go.Scatter(x=df_p["Age"].to_numpy(), y=pcts, mode='lines', name="Return %", hovertemplate="%{y:.1f}%")])
+                fig_r.update_layout(height=250, margin=dict(t=20, b=20, l=20, r=20), yaxis_title="% Return", yaxis=dict(tickformat=".1f"))
+                st.plotly_chart(fig_r, use_container_width=True)
+
+            st.markdown("**Savings Rate (Accumulation Phase)**")
+            # Keep original savings rate chart but limit to working years to avoid confusion
+            df_savings_plot = df_income[df_income["Age"] < stop_age]
+        
+            fig_s = go.Figure(data=[go.Scatter(
+                x=df_savings_plot["Age"].to_numpy(), 
+                y=df_savings_plot["SavingsRate"].to_numpy() * 100, 
+                mode='lines', 
+                name="Savings Rate", 
+                line=dict(color="#42A5F5"),
+                hovertemplate="%{y:.1f}%"
+            )])
+            fig_s.update_layout(
+                height=250, 
+                margin=dict(t=20, b=20, l=20, r=20), 
+                yaxis_title="Savings Rate (%)",
+                yaxis=dict(tickformat=".1f")
+            )
+            st.plotly_chart(fig_s, use_container_width=True)
+
+    if tab3.open:
+        with tab3:
+            st.markdown("### Net Worth Summary (Start of Year)")
+            st.caption("Simplified overview of your projected wealth at the start of each age.")
+        
+            st.dataframe(
+                df_p[NET_WORTH_TABLE_COLS], 
+                use_container_width=True,
+                hide_index=True,
+                column_config=NET_WORTH_TABLE_CONFIG
             )
-            st.plotly_chart(fig_i, use_container_width=True)
-            
-        with c2:
-            st.markdown("**Investment Returns Glide Path**")
-            fig_r = go.Figure()
-            pcts = [r*100 for r in annual_rates_by_year_full]
-            fig_r.add_trace(go.Scatter(x=df_p["Age"], y=pcts[:len(df_p)], mode='lines', name="Return %", hovertemplate="%{y:.1f}%"))
-            fig_r.update_layout(height=250, margin=dict(t=20, b=20, l=20, r=20), yaxis_title="% Return", yaxis=dict(tickformat=".1f"))
-            st.plotly_chart(fig_r, use_container_width=True)
-
-        st.markdown("**Savings Rate (Accumulation Phase)**")
-        # Keep original savings rate chart but limit to working years to avoid confusion
-        df_savings_plot = df_income[df_income["Age"] < stop_age]
-        
-        fig_s = go.Figure()
-        fig_s.add_trace(go.Scatter(
-            x=df_savings_plot["Age"], 
-            y=df_savings_plot["SavingsRate"] * 100, 
-            mode='lines', 
-            name="Savings Rate", 
-            line=dict(color="#42A5F5"),
-            hovertemplate="%{y:.1f}%"
-        ))
-        fig_s.update_layout(
-            height=250, 
-            margin=dict(t=20, b=20, l=20, r=20), 
-            yaxis_title="Savings Rate (%)",
-            yaxis=dict(tickformat=".1f")
-        )
-        st.plotly_chart(fig_s, use_container_width=True)
-
-    with tab3:
-        st.markdown("### Net Worth Summary (Start of Year)")
-        st.caption("Simplified overview of your projected wealth at the start of each age.")
-        
-        format_dict = {
-            "Balance": "${:,.0f}",
-            "HomeEquity": "${:,.0f}", 
-            "NetWorth": "${:,.0f}",
-            "AnnualExpense": "${:,.0f}",
-            "Age": "{:.0f}"
-        }
-        st.dataframe(
-            df_p[["Age", "Balance", "HomeEquity", "NetWorth"]].style.format(format_dict), 
-            use_container_width=True,
-            hide_index=True
-        )
         
-    with tab4:
-        st.markdown(f"**Audit Table: {scenario_label}**")
-        st.caption("Detailed view of Start Balance to End Balance flow.")
+    if tab4.open:
+        with tab4:
+            st.markdown(f"**Audit Table: {scenario_label}**")
+            st.caption("Detailed view of Start Balance to End Balance flow.")
 
-        st.markdown("""
-        #### 🧮 Flow Logic
-        
-        $$
-        \\text{EndBalance} = \\text{StartBalance} + \\text{Growth} + \\text{AnnualSavings} - \\text{Withdrawals}
-        $$
-        
-        Note: The **StartBalance** of the next row (Age + 1) equals the **EndBalance** of the current row.
-        """)
+            st.markdown("""
+            #### 🧮 Flow Logic
         
-        # Add Total Spending Column (Portfolio Draws + Active Income Used)
-        # This reflects the total lifestyle cost (Spending).
-        # Note: We use the pre-calculated detailed_total_spending to ensure it matches
-        # consumption rather than just Income + Withdrawal.
-
-        format_dict_d = {
-            "StartBalance": "${:,.0f}",
-            "EndBalance": "${:,.0f}",
-            "LivingWithdrawal": "${:,.0f}",
-            "TaxPenalty": "${:,.0f}",
-            "KidCost": "${:,.0f}",
-            "CarCost": "${:,.0f}",
-            "HomeCost": "${:,.0f}",
-            "TotalPortfolioDraw": "${:,.0f}",
-            "ScenarioActiveIncome": "${:,.0f}",
-            "InvestGrowthYear": "${:,.0f}",
-            "ContribYear": "${:,.0f}",
-            "TotalSpending": "${:,.0f}",
-            "AnnualRate": "{:.2%}",
-            "Age": "{:.0f}"
-        }
+            $$
+            \\text{EndBalance} = \\text{StartBalance} + \\text{Growth} + \\text{AnnualSavings} - \\text{Withdrawals}
+            $$
         
-        # UPDATED COLUMN ORDERING AS REQUESTED
-        cols = [
-            "Age", 
-            "StartBalance",
-            "AnnualRate",
-            "InvestGrowthYear",
-            "ContribYear", 
-            # "TotalPortfolioDraw", # Removed to reduce clutter in favor of itemized list
-            "EndBalance",
-            "TotalSpending",
-            "LivingWithdrawal", 
-            "TaxPenalty", 
-            "KidCost", 
-            "CarCost", 
-            "HomeCost",
-            "ScenarioActiveIncome"
-        ]
+            Note: The **StartBalance** of the next row (Age + 1) equals the **EndBalance** of the current row.
+            """)
         
-        st.dataframe(
-            df_p[cols].style.format(format_dict_d),
-            use_container_width=True,
-            hide_index=True
-        )
+            # Add Total Spending Column (Portfolio Draws + Active Income Used)
+            # This reflects the total lifestyle cost (Spending).
+            # Note: We use the pre-calculated detailed_total_spending to ensure it matches
+            # consumption rather than just Income + Withdrawal.
+
+            st.dataframe(
+                df_p[AUDIT_TABLE_COLS],
+                use_container_width=True,
+                hide_index=True,
+                column_config=AUDIT_TABLE_CONFIG
+            )
 
 if __name__ == "__main__":
     main()